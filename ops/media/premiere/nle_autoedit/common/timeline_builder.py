@@ -8,12 +8,18 @@ NLE-specific layers.
 
 from __future__ import annotations
 
+import codecs
 import csv
 import dataclasses
+import io
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 
 import yaml
 
@@ -51,6 +57,11 @@ class TemplateDefinition:
     audio_tracks: List[TemplateTrack]
     color_map: Dict[str, str]
     path_map: Dict[str, str] = dataclasses.field(default_factory=dict)
+    # Already-normalized label names (color_map values) for O(1) membership checks.
+    _normalized_colors: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._normalized_colors = frozenset(self.color_map.values())
 
 
 @dataclass
@@ -69,9 +80,9 @@ class Segment:
     kind: str  # "block" or "gap"
     start_frames: int
     end_frames: int
+    raw_rows: List[CsvRow]  # passed explicitly at every construction site
     color: Optional[str] = None
     transcript: Optional[str] = None
-    raw_rows: List[CsvRow] = field(default_factory=list)
 
     @property
     def duration_frames(self) -> int:
@@ -95,7 +106,7 @@ class Timeline:
     fps: float
     placements: List[ClipPlacement]
     gaps: List[Segment]
-    diagnostics: Dict[str, object] = field(default_factory=dict)
+    diagnostics: Dict[str, object]
 
 
 # ---------------------------------------------------------------------------
@@ -116,32 +127,50 @@ class CsvFormatError(ValueError):
     pass
 
 
+def _read_all(path: Path) -> bytes:
+    """Read a whole file in one pass, hinting sequential readahead where supported."""
+    with path.open("rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        return f.readall()
+
+
 def load_csv_rows(csv_path: Path) -> List[CsvRow]:
-    with csv_path.open(newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        missing = [h for h in TARGET_HEADERS if h not in reader.fieldnames]
-        if missing:
-            raise CsvFormatError(f"Missing headers: {missing}")
-        rows: List[CsvRow] = []
-        for raw in reader:
-            if not raw:
-                continue
-            speaker = (raw.get("Speaker Name") or "").strip()
-            in_tc = (raw.get("イン点") or "").strip()
-            out_tc = (raw.get("アウト点") or "").strip()
-            text = (raw.get("文字起こし") or "").strip()
-            color = (raw.get("色選択") or "").strip()
-            if not in_tc and not out_tc and not color:
-                continue
-            rows.append(
-                CsvRow(
-                    speaker=speaker,
-                    in_timecode=in_tc,
-                    out_timecode=out_tc,
-                    transcript=text,
-                    color=color,
-                )
+    raw = _read_all(csv_path)
+    # Skip a UTF-8 BOM once and decode the rest in a single C-level call.
+    start = len(codecs.BOM_UTF8) if raw.startswith(codecs.BOM_UTF8) else 0
+    content = str(memoryview(raw)[start:], "utf-8")
+    reader = csv.reader(io.StringIO(content, newline=""))
+    header = next(reader, None) or []
+    # Last occurrence wins for duplicated headers, matching csv.DictReader.
+    column = {name: i for i, name in enumerate(header)}
+    missing = [h for h in TARGET_HEADERS if h not in column]
+    if missing:
+        raise CsvFormatError(f"Missing headers: {missing}")
+    # Picks the TARGET_HEADERS cells (speaker, in, out, text, color) as one tuple.
+    pick = itemgetter(*(column[h] for h in TARGET_HEADERS))
+    width = len(header)
+    rows: List[CsvRow] = []
+    for cells in reader:
+        if not cells:
+            continue
+        if len(cells) < width:
+            cells += [""] * (width - len(cells))
+        speaker, in_tc, out_tc, text, color = [cell.strip() for cell in pick(cells)]
+        if not in_tc and not out_tc and not color:
+            continue
+        rows.append(
+            CsvRow(
+                speaker=speaker,
+                in_timecode=in_tc,
+                out_timecode=out_tc,
+                transcript=text,
+                color=color,
             )
+        )
     return rows
 
 
@@ -154,6 +183,7 @@ def normalize_timecode(tc: str) -> str:
     return tc.replace(";", ":")
 
 
+@lru_cache(maxsize=65536)
 def timecode_to_frames(tc: str, fps: float) -> int:
     tc = normalize_timecode(tc)
     parts = tc.split(":")
@@ -170,19 +200,38 @@ def timecode_to_frames(tc: str, fps: float) -> int:
 # ---------------------------------------------------------------------------
 
 
+_GAP_COLOR_ID = 0
+_INVALID_COLOR_ID = -1
+
+
+def _color_ids_for_rows(rows: Sequence[CsvRow]) -> List[int]:
+    """Map each row's color to an int: GAP → 0, empty → -1, distinct colors → 1..n."""
+    seen: Dict[str, int] = {}
+    ids: List[int] = []
+    for row in rows:
+        color = row.color
+        # Cheap first-letter test keeps the common block row allocation-free.
+        if color[:1] in "Gg" and color[:3].upper() == "GAP":
+            ids.append(_GAP_COLOR_ID)
+        elif not color:
+            ids.append(_INVALID_COLOR_ID)
+        else:
+            ids.append(seen.setdefault(color, len(seen) + 1))
+    return ids
+
+
 def build_segments(rows: Sequence[CsvRow], fps: float) -> Tuple[List[Segment], List[str]]:
     segments: List[Segment] = []
     warnings: List[str] = []
-    current_color: Optional[str] = None
+    current_color_id = _GAP_COLOR_ID  # no open block
     current_block: Optional[Segment] = None
 
-    for row in rows:
-        color = row.color
-        if color.upper().startswith("GAP"):
+    for row, color_id in zip(rows, _color_ids_for_rows(rows)):
+        if color_id == _GAP_COLOR_ID:
             if current_block:
                 segments.append(current_block)
                 current_block = None
-                current_color = None
+                current_color_id = _GAP_COLOR_ID
             if not row.in_timecode or not row.out_timecode:
                 warnings.append(f"GAP 行にイン/アウトが未設定: {row}")
                 continue
@@ -196,14 +245,14 @@ def build_segments(rows: Sequence[CsvRow], fps: float) -> Tuple[List[Segment], L
                     kind="gap",
                     start_frames=start,
                     end_frames=end,
-                    color=color,
+                    color=row.color,
                     transcript=row.transcript,
                     raw_rows=[row],
                 )
             )
             continue
 
-        if not row.in_timecode or not row.out_timecode or not color:
+        if not row.in_timecode or not row.out_timecode or color_id == _INVALID_COLOR_ID:
             warnings.append(f"ブロック行の必須項目欠落: {row}")
             continue
 
@@ -213,15 +262,15 @@ def build_segments(rows: Sequence[CsvRow], fps: float) -> Tuple[List[Segment], L
             warnings.append(f"アウトがイン以下: {row}")
             continue
 
-        if current_color != color:
+        if current_color_id != color_id:
             if current_block:
                 segments.append(current_block)
-            current_color = color
+            current_color_id = color_id
             current_block = Segment(
                 kind="block",
                 start_frames=in_frames,
                 end_frames=out_frames,
-                color=color,
+                color=row.color,
                 transcript=row.transcript,
                 raw_rows=[row],
             )
@@ -267,10 +316,16 @@ def load_template(template_path: Path) -> TemplateDefinition:
 # ---------------------------------------------------------------------------
 
 
-def apply_color_map(color: str, color_map: Dict[str, str]) -> str:
+def apply_color_map(
+    color: str,
+    color_map: Dict[str, str],
+    normalized_colors: Optional[FrozenSet[str]] = None,
+) -> str:
     if not color:
         return ""
-    if color in color_map.values():  # already normalized
+    if normalized_colors is None:
+        normalized_colors = frozenset(color_map.values())
+    if color in normalized_colors:  # already normalized
         return color
     return color_map.get(color.lower(), "") or ""
 
@@ -294,7 +349,9 @@ def build_timeline(csv_path: Path, template_path: Path) -> Timeline:
             continue
 
         # block
-        label = apply_color_map(segment.color or "", template.color_map)
+        label = apply_color_map(
+            segment.color or "", template.color_map, template._normalized_colors
+        )
         for track in template.video_tracks:
             source_name = track.source or track.name
             placements.append(
@@ -341,6 +398,24 @@ def build_timeline(csv_path: Path, template_path: Path) -> Timeline:
     )
 
 
+def _build_timeline_pair(pair: Tuple[Path, Path]) -> Timeline:
+    return build_timeline(*pair)
+
+
+def build_timelines_parallel(
+    pairs: Sequence[Tuple[Path, Path]], workers: Optional[int] = None
+) -> List[Timeline]:
+    """Build one timeline per (csv, template) pair, fanning out across processes.
+
+    Results are returned in the same order as ``pairs``. A single pair is built
+    in-process to avoid pool start-up cost.
+    """
+    if len(pairs) <= 1:
+        return [build_timeline(*pair) for pair in pairs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_build_timeline_pair, pairs))
+
+
 __all__ = [
     "FpsSpec",
     "TemplateTrack",
@@ -353,5 +428,6 @@ __all__ = [
     "build_segments",
     "load_template",
     "build_timeline",
+    "build_timelines_parallel",
 ]
 
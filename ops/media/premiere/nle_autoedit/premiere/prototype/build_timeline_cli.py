@@ -3,10 +3,12 @@
 
 Usage:
     python build_timeline_cli.py path/to/case.csv path/to/template.yaml
+    python build_timeline_cli.py case1.csv tmpl1.yaml case2.csv tmpl2.yaml ...
 
 This tool relies on the shared timeline builder so that Premiere / Resolve
 front-ends can compare results during development. It does not emit XML; the
-output is a human readable summary + diagnostics JSON.
+output is a human readable summary + diagnostics JSON. When several
+CSV/template pairs are given they are built in parallel worker processes.
 """
 
 from __future__ import annotations
@@ -20,44 +22,58 @@ ROOT = Path(__file__).resolve().parents[3]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from projects.nle_autoedit.common.timeline_builder import build_timeline  # type: ignore  # noqa: E402
+from projects.nle_autoedit.common.timeline_builder import build_timelines_parallel  # type: ignore  # noqa: E402
 
 
-def main() -> int:
-    if len(sys.argv) != 3:
-        print(__doc__)
-        return 1
-
-    csv_path = Path(sys.argv[1]).expanduser()
-    tmpl_path = Path(sys.argv[2]).expanduser()
-
-    if not csv_path.exists():
-        print(f"CSV not found: {csv_path}")
-        return 2
-    if not tmpl_path.exists():
-        print(f"Template not found: {tmpl_path}")
-        return 3
-
-    timeline = build_timeline(csv_path, tmpl_path)
-
+def print_summary(timeline) -> None:
     print(f"FPS: {timeline.fps}")
     print(f"Total placements: {len(timeline.placements)}")
     print(f"Captured gaps: {len(timeline.gaps)}\n")
 
-    for placement in timeline.placements:
-        print(
-            f"[{placement.track_name}] {placement.source_name}"
-            f"  timeline {placement.start_frames}->{placement.end_frames}"
-            f"  source {placement.source_in}->{placement.source_out}"
-            f"  label={placement.label}"
-        )
+    # Build every placement line first and hand stdout a single write.
+    lines = [
+        f"[{placement.track_name}] {placement.source_name}"
+        f"  timeline {placement.start_frames}->{placement.end_frames}"
+        f"  source {placement.source_in}->{placement.source_out}"
+        f"  label={placement.label}\n"
+        for placement in timeline.placements
+    ]
+    sys.stdout.write("".join(lines))
 
     print("\nDiagnostics:")
     print(json.dumps(timeline.diagnostics, indent=2, ensure_ascii=False))
 
+
+def main() -> int:
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        print(__doc__)
+        return 1
+
+    pairs = []
+    for csv_arg, tmpl_arg in zip(args[::2], args[1::2]):
+        csv_path = Path(csv_arg).expanduser()
+        tmpl_path = Path(tmpl_arg).expanduser()
+
+        if not csv_path.exists():
+            print(f"CSV not found: {csv_path}")
+            return 2
+        if not tmpl_path.exists():
+            print(f"Template not found: {tmpl_path}")
+            return 3
+        pairs.append((csv_path, tmpl_path))
+
+    timelines = build_timelines_parallel(pairs)
+
+    for index, ((csv_path, _), timeline) in enumerate(zip(pairs, timelines)):
+        if len(pairs) > 1:
+            if index:
+                print()
+            print(f"=== {csv_path} ===")
+        print_summary(timeline)
+
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -2,7 +2,8 @@
 """Wrapper around the shared timeline builder for Resolve prototyping.
 
 Premiere 版 CLI と同じ出力を得られるようにし、Resolve スクリプト開発時の
-地盤データとして活用する。
+地盤データとして活用する。CSV / テンプレのペアを複数渡した場合は並列に
+ビルドし、ペイロードの配列を出力する。
 """
 
 from __future__ import annotations
@@ -11,27 +12,33 @@ import json
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 ROOT = Path(__file__).resolve().parents[3]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from projects.nle_autoedit.common.timeline_builder import build_timeline  # type: ignore  # noqa: E402
-
+from projects.nle_autoedit.common.timeline_builder import build_timelines_parallel  # type: ignore  # noqa: E402
 
-def main() -> int:
-    if len(sys.argv) != 3:
-        print("Usage: python build_timeline_cli.py <csv> <template.yaml>")
-        return 1
 
-    csv_path = Path(sys.argv[1]).expanduser()
-    tmpl_path = Path(sys.argv[2]).expanduser()
-    if not csv_path.exists() or not tmpl_path.exists():
-        print("Input files not found")
-        return 2
+def write_json(payload: object) -> None:
+    """Emit payload as indented UTF-8 JSON on stdout (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(
+            orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        )
+        sys.stdout.buffer.flush()
+        return
+    print(json.dumps(payload, indent=2, ensure_ascii=False))
 
-    timeline = build_timeline(csv_path, tmpl_path)
 
-    payload = {
+def build_payload(timeline) -> dict:
+    return {
         "fps": timeline.fps,
         "placements": [
             {
@@ -58,7 +65,24 @@ def main() -> int:
         "diagnostics": timeline.diagnostics,
     }
 
-    print(json.dumps(payload, indent=2, ensure_ascii=False))
+
+def main() -> int:
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        print("Usage: python build_timeline_cli.py <csv> <template.yaml> [<csv> <template.yaml> ...]")
+        return 1
+
+    pairs = [
+        (Path(csv_arg).expanduser(), Path(tmpl_arg).expanduser())
+        for csv_arg, tmpl_arg in zip(args[::2], args[1::2])
+    ]
+    if not all(csv_path.exists() and tmpl_path.exists() for csv_path, tmpl_path in pairs):
+        print("Input files not found")
+        return 2
+
+    payloads = [build_payload(timeline) for timeline in build_timelines_parallel(pairs)]
+
+    write_json(payloads[0] if len(payloads) == 1 else payloads)
     return 0
 
 
@@ -4,120 +4,194 @@ CSV + XML Timeline Cutter
 Takes existing Premiere XML and cuts it based on CSV timecodes
 """
 
+import contextlib
+import copy
 import csv
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from functools import lru_cache
+import importlib.util
 import uuid
 import os
+import stat
 import sys
 
-# Try to import tkinter, but also verify it can initialize (fallback to CLI on TclError)
+# Prefer lxml (libxml2 parse/serialize) when installed; the stdlib ElementTree API is the fallback
 try:
-    import tkinter as tk
-    from tkinter import filedialog, messagebox
-    try:
-        _root_test = tk.Tk()
-        _root_test.withdraw()
-        _root_test.destroy()
-        HAS_GUI = True
-    except Exception:
-        # Tkinter is present but cannot open a display or initialize properly
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
+# tkinter is only imported when a GUI is needed; find_spec locates it without executing it
+HAS_TK = importlib.util.find_spec('tkinter') is not None
+
+HAS_GUI = None  # Unknown until gui_available() runs the Tk probe
+
+
+def gui_available():
+    """Return True when Tk can open a display (probed once, then cached)"""
+    global HAS_GUI
+    if HAS_GUI is None:
         HAS_GUI = False
-except Exception:
-    HAS_GUI = False
+        if HAS_TK:
+            try:
+                import tkinter as tk
+                root_test = tk.Tk()
+                root_test.withdraw()
+                root_test.destroy()
+                HAS_GUI = True
+            except Exception:
+                # Tkinter cannot be loaded, open a display or initialize properly (fallback to CLI)
+                pass
+    return HAS_GUI
 
 
 TIMELINE_FPS = 30000 / 1001  # Premiere NTSC timeline fps (~29.97)
+PPRO_TICKS_PER_SECOND = 254016000000
+# Exact ticks per frame at 30000/1001 fps: 254016000000 * 1001 / 30000
+PPRO_TICKS_PER_NTSC_FRAME = 8475667200
 
 
+@lru_cache(maxsize=65536)
 def timecode_to_frames(timecode, fps=TIMELINE_FPS):
     """Convert timecode string to frame number"""
     if not timecode or timecode.strip() == '':
         return 0
     
     # Handle both : and ; separators
-    parts = timecode.replace(';', ':').split(':')
-    
-    if len(parts) == 4:  # HH:MM:SS:FF
-        hours, minutes, seconds, frames = map(int, parts)
-    elif len(parts) == 3:  # MM:SS:FF
-        hours = 0
-        minutes, seconds, frames = map(int, parts)
-    elif len(parts) == 2:  # SS:FF
-        hours = minutes = 0
-        seconds, frames = map(int, parts)
+    timecode = timecode.replace(';', ':')
+    separators = timecode.count(':')
+    
+    if separators == 3:  # HH:MM:SS:FF
+        hours, minutes, seconds, frames = timecode.split(':')
+        total_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+    elif separators == 2:  # MM:SS:FF
+        minutes, seconds, frames = timecode.split(':')
+        total_seconds = int(minutes) * 60 + int(seconds)
+    elif separators == 1:  # SS:FF
+        seconds, frames = timecode.split(':')
+        total_seconds = int(seconds)
     else:
         return 0
+    frames = int(frames)
     
-    total_frames = (hours * 3600 + minutes * 60 + seconds) * fps + frames
-    return int(round(total_frames))
+    if fps == TIMELINE_FPS:
+        # Exact 30000/1001 integer rounding (a x.5 tie is impossible with /1001)
+        return (total_seconds * 60000 + frames * 2002 + 1001) // 2002
+    return int(round(total_seconds * fps + frames))
 
 
 def frames_to_ppro_ticks(frames, fps=TIMELINE_FPS):
     """Convert frames to Premiere Pro ticks (254016000000 per second)"""
+    if fps == TIMELINE_FPS:
+        return frames * PPRO_TICKS_PER_NTSC_FRAME
     seconds = frames / fps
-    return int(seconds * 254016000000)
-
-
+    return int(seconds * PPRO_TICKS_PER_SECOND)
+
+
+# 直接Premiere Proラベル名を使用（GASと統一）
+PREMIERE_LABELS = frozenset({
+    'Violet', 'Rose', 'Mango', 'Yellow', 'Lavender', 'Caribbean',
+    'Tan', 'Forest', 'Blue', 'Purple', 'Teal', 'Brown', 'Gray',
+    'Iris', 'Cerulean', 'Magenta'
+})
+
+# 古い色名からの変換マッピング（後方互換性のため）
+LEGACY_COLOR_MAP = {
+    'rose': 'Rose',
+    'pink': 'Rose', 
+    'cyan': 'Caribbean',
+    'blue': 'Blue',
+    'mint': 'Mango',
+    'green': 'Forest',
+    'yellow': 'Yellow',
+    'orange': 'Mango',
+    'red': 'Rose',
+    'purple': 'Purple',
+    'brown': 'Brown',
+    'gray': 'Gray',
+    'lavender': 'Lavender',
+    'tan': 'Tan',
+    'teal': 'Teal',
+    'magenta': 'Magenta',
+    'violet': 'Violet',
+    'forest': 'Forest',
+    'iris': 'Iris',
+    'cerulean': 'Cerulean',
+    'caribbean': 'Caribbean',
+    'mango': 'Mango'
+}
+
+
+@lru_cache(maxsize=32)
 def csv_color_to_premiere_label(csv_color):
     """Convert CSV color to Premiere Pro label"""
-    # 直接Premiere Proラベル名を使用（GASと統一）
-    valid_labels = [
-        'Violet', 'Rose', 'Mango', 'Yellow', 'Lavender', 'Caribbean', 
-        'Tan', 'Forest', 'Blue', 'Purple', 'Teal', 'Brown', 'Gray',
-        'Iris', 'Cerulean', 'Magenta'
-    ]
-    
-    # 古い色名からの変換マッピング（後方互換性のため）
-    legacy_color_map = {
-        'rose': 'Rose',
-        'pink': 'Rose', 
-        'cyan': 'Caribbean',
-        'blue': 'Blue',
-        'mint': 'Mango',
-        'green': 'Forest',
-        'yellow': 'Yellow',
-        'orange': 'Mango',
-        'red': 'Rose',
-        'purple': 'Purple',
-        'brown': 'Brown',
-        'gray': 'Gray',
-        'lavender': 'Lavender',
-        'tan': 'Tan',
-        'teal': 'Teal',
-        'magenta': 'Magenta',
-        'violet': 'Violet',
-        'forest': 'Forest',
-        'iris': 'Iris',
-        'cerulean': 'Cerulean',
-        'caribbean': 'Caribbean',
-        'mango': 'Mango'
-    }
-    
     # 空の場合はデフォルト
     if not csv_color or csv_color.strip() == '':
         return 'Caribbean'
     
     # そのままPremiereラベル名として有効かチェック
-    if csv_color in valid_labels:
+    if csv_color in PREMIERE_LABELS:
         return csv_color
     
     # 古い色名から変換
-    return legacy_color_map.get(csv_color.lower(), 'Caribbean')
+    return LEGACY_COLOR_MAP.get(csv_color.lower(), 'Caribbean')
+
+
+def is_regular_file(path):
+    """Return True when path is an existing regular file (one stat call; directories are rejected)"""
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
+def ensure(parent, tag, present=True):
+    """Return the first <tag> child of parent, creating it when missing.
+
+    Pass present=False when the tag is known to be absent to skip the child scan.
+    """
+    child = parent.find(tag) if present else None
+    if child is None:
+        child = ET.SubElement(parent, tag)
+    return child
+
+
+def parse_xml(xml_file_path):
+    """Parse an XML file into an ElementTree (comments/PIs dropped under lxml, as in the stdlib)"""
+    if HAS_LXML:
+        return ET.parse(xml_file_path, ET.XMLParser(remove_comments=True, remove_pis=True))
+    return ET.parse(xml_file_path)
+
+
+def index_media_files(root):
+    """Map file id -> first <media>/<file> element with that id (document order).
+
+    Equivalent to ``root.find(f".//media/file[@id='{fid}']")`` per id, but walks
+    the tree once instead of once per lookup.
+    """
+    file_by_id = {}
+    for media_elem in root.iter('media'):
+        for file_elem in media_elem.findall('file'):
+            fid = file_elem.get('id')
+            if fid is not None and fid not in file_by_id:
+                file_by_id[fid] = file_elem
+    return file_by_id
 
 
 def extract_audio_files_from_xml(xml_file_path):
     """Extract audio file information from existing XML.
     Returns a list of dicts with keys: name, pathurl, element, source_duration, file_id, masterclipid.
     """
-    tree = ET.parse(xml_file_path)
+    tree = parse_xml(xml_file_path)
     root = tree.getroot()
+    file_by_id = index_media_files(root)
 
     audio_files = []
     seen_names = set()
 
     # Find all clipitems with file references
-    for clipitem in root.findall('.//clipitem'):
+    for clipitem in root.iter('clipitem'):
         file_elem = clipitem.find('file')
         if file_elem is not None:
             name_elem = file_elem.find('name')
@@ -128,10 +202,8 @@ def extract_audio_files_from_xml(xml_file_path):
             full_file_elem = None
             if file_id:
                 # Try to get the full file definition (may point to another clipitem's file)
-                full_file_elem = root.find(f".//media/file[@id='{file_id}']")
-                if full_file_elem is None:
-                    # Fallback: use this file element itself
-                    full_file_elem = file_elem
+                # Fallback: use this file element itself
+                full_file_elem = file_by_id.get(file_id, file_elem)
             else:
                 full_file_elem = file_elem
 
@@ -181,7 +253,7 @@ def extract_audio_files_from_xml(xml_file_path):
 def load_graphic_templates(template_path):
     templates = {}
     try:
-        ttree = ET.parse(template_path)
+        ttree = parse_xml(template_path)
         troot = ttree.getroot()
         for clip in troot.findall('.//sequence/media/video/track/clipitem'):
             key = clip.findtext('filter/effect/name') or clip.findtext('name') or ''
@@ -193,8 +265,19 @@ def load_graphic_templates(template_path):
     return templates
 
 
+def open_csv(csv_file_path):
+    """Open the timeline CSV for csv.reader (newline='' per the csv docs, 1 MiB read buffer)"""
+    return open(csv_file_path, 'r', encoding='utf-8', newline='', buffering=1 << 20)
+
+
 def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_template_path=None):
-    """Create cut XML using template XML structure and CSV timecodes"""
+    """Create cut XML using template XML structure and CSV timecodes.
+    csv_file_path may be a path or an already-open text handle (see open_csv).
+    """
+    # An open handle is read as-is (and left open); its .name still drives the sequence name
+    csv_handle = csv_file_path if hasattr(csv_file_path, 'read') else None
+    if csv_handle is not None:
+        csv_file_path = getattr(csv_handle, 'name', 'timeline.csv')
     
     # Extract audio files from template XML
     audio_files = extract_audio_files_from_xml(template_xml_path)
@@ -204,8 +287,9 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
         return None
     
     # Parse template XML to get structure
-    template_tree = ET.parse(template_xml_path)
+    template_tree = parse_xml(template_xml_path)
     template_root = template_tree.getroot()
+    template_file_by_id = index_media_files(template_root)
     
     # Create new XML with same structure
     root = ET.Element('xmeml', version='4')
@@ -246,33 +330,43 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     template_video = template_media.find('video')
     if template_video is not None:
         video = ET.SubElement(media, 'video')
-        # Copy all video content (deep copy semantics via serialization)
-        for child in template_video:
-            video.append(ET.fromstring(ET.tostring(child)))
+        # Copy all video content
+        video.extend(copy.deepcopy(child) for child in template_video)
     
     # Copy audio structure but replace clipitems
     template_audio = template_media.find('audio')
     audio = ET.SubElement(media, 'audio')
     
-    # Copy audio format and outputs
-    for child in template_audio:
-        if child.tag != 'track':
-            audio.append(child)
+    # Copy audio format and outputs (collected first: lxml moves appended nodes out of the template)
+    audio.extend([child for child in template_audio if child.tag != 'track'])
     
     # Read CSV into segments: normal blocks grouped by color, and gaps with telop text
     segments = []
     current_color = None
     current_block = None
     
-    with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        
+    csv_source = contextlib.nullcontext(csv_handle) if csv_handle is not None else open_csv(csv_file_path)
+    with csv_source as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        # Resolve column indices once; absent columns read from a padded empty cell
+        column = {name: i for i, name in enumerate(header)}
+        blank = len(header)
+        i_in = column.get('イン点', blank)
+        i_out = column.get('アウト点', blank)
+        i_text = column.get('文字起こし', blank)
+        i_color = column.get('色選択', blank)
+        tc2f = timecode_to_frames
+
         for row in reader:
-            speaker = row.get('Speaker Name', '').strip()
-            in_point = row.get('イン点', '').strip()
-            out_point = row.get('アウト点', '').strip()
-            text = row.get('文字起こし', '').strip()
-            color = row.get('色選択', '').strip()
+            if not row:
+                continue
+            if len(row) <= blank:
+                row += [''] * (blank + 1 - len(row))
+            in_point = row[i_in].strip()
+            out_point = row[i_out].strip()
+            text = row[i_text].strip()
+            color = row[i_color].strip()
             is_gap = color.startswith('GAP_') if color else False
 
             # GAP 行
@@ -284,8 +378,8 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 # Gap duration from in/out
                 if not out_point:
                     continue
-                start_frames = timecode_to_frames(in_point)
-                end_frames = timecode_to_frames(out_point)
+                start_frames = tc2f(in_point)
+                end_frames = tc2f(out_point)
                 if end_frames <= start_frames:
                     continue
                 segments.append({
@@ -301,8 +395,8 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 continue
             
             # Convert timecodes to frames
-            in_frames = timecode_to_frames(in_point)
-            out_frames = timecode_to_frames(out_point)
+            in_frames = tc2f(in_point)
+            out_frames = tc2f(out_point)
             
             if in_frames >= out_frames:
                 continue
@@ -334,21 +428,24 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     gaps = [s for s in segments if s['type']=='gap']
     print(f"検出: ブロック {len(blocks)}個 / ギャップ {len(gaps)}個")
 
+    # Source in/out ticks depend only on the block, so convert them once for all tracks
+    for block in blocks:
+        block['ppro_ticks_in'] = str(frames_to_ppro_ticks(block['start_frames']))
+        block['ppro_ticks_out'] = str(frames_to_ppro_ticks(block['end_frames']))
+
     # Helper: find max clipitem numeric suffix to avoid duplicate IDs
-    import re
-    id_re = re.compile(r"clipitem-(\d+)")
     max_clip_num = 0
-    for ci in template_root.findall('.//clipitem'):
+    for ci in template_root.iter('clipitem'):
         cid = ci.get('id') or ''
-        m = id_re.match(cid)
-        if m:
-            try:
-                max_clip_num = max(max_clip_num, int(m.group(1)))
-            except Exception:
-                pass
+        if cid.startswith('clipitem-'):
+            suffix = cid[9:]
+            if suffix.isdecimal():
+                max_clip_num = max(max_clip_num, int(suffix))
     next_clip_num = max_clip_num + 1
 
-    template_has_links = bool(template_root.findall('.//sequence/media/audio/track/clipitem/link'))
+    # Audio tracks are collected once; link detection happens in the per-track pass below
+    template_audio_track_nodes = template_root.findall('.//sequence/media/audio/track')
+    template_has_links = False
 
     audio_file_map = {}
     audio_file_name_map = {}
@@ -362,7 +459,9 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
 
     # Build per-track source mapping from template (file id/name + source channel)
     track_sources = []
-    for t_idx, t_track in enumerate(template_root.findall('.//sequence/media/audio/track')):
+    for t_idx, t_track in enumerate(template_audio_track_nodes):
+        if not template_has_links:
+            template_has_links = next(t_track.iterfind('clipitem/link'), None) is not None
         # Find first clipitem with a file reference in this template track
         src = {
             'file_id': None,
@@ -385,9 +484,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 fid = file_elem.get('id')
                 if fid:
                     src['file_id'] = fid
-                    full = template_root.find(f".//media/file[@id='{fid}']")
-                    if full is None:
-                        full = file_elem
+                    full = template_file_by_id.get(fid, file_elem)
                     src['element'] = full
                     n = full.find('name')
                     p = full.find('pathurl')
@@ -437,6 +534,11 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 src['source_duration'] = lookup['source_duration']
             if not src.get('masterclipid') and lookup.get('masterclipid'):
                 src['masterclipid'] = lookup['masterclipid']
+        if not src.get('name'):
+            if src.get('pathurl'):
+                src['name'] = os.path.splitext(os.path.basename(src['pathurl']))[0]
+            else:
+                src['name'] = f'Audio Track {t_idx + 1}'
         track_sources.append(src)
 
     # Create audio tracks based on template
@@ -451,7 +553,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
         template_has_clip = template_track.find('clipitem') is not None
         if not template_has_clip:
             # Copy the track structure as-is (keeps empty tracks untouched)
-            audio.append(ET.fromstring(ET.tostring(template_track)))
+            audio.append(copy.deepcopy(template_track))
             continue
 
         # Track container
@@ -461,26 +563,36 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
 
         # Create clipitems for this track
         timeline_position = 0
-        # Use per-track source mapping to match template channel layout
-        srcmap = track_sources[track_idx] if track_idx < len(track_sources) else {}
-        audio_file = {
-            'name': srcmap.get('name'),
-            'pathurl': srcmap.get('pathurl'),
-            'element': srcmap.get('element'),
-            'file_id': srcmap.get('file_id'),
-            'source_duration': srcmap.get('source_duration'),
-            'masterclipid': srcmap.get('masterclipid'),
-        }
-        if not audio_file.get('name'):
-            if audio_file.get('pathurl'):
-                audio_file['name'] = os.path.splitext(os.path.basename(audio_file['pathurl']))[0]
-            else:
-                audio_file['name'] = f'Audio Track {track_idx + 1}'
+        # Use per-track source mapping (fully resolved above) to match template channel layout
+        if track_idx < len(track_sources):
+            audio_file = track_sources[track_idx]
+        else:
+            audio_file = {'name': f'Audio Track {track_idx + 1}'}
         # IDs to reuse from template (avoid collisions with video section)
         template_file_id = audio_file.get('file_id')
         template_masterclip_id = audio_file.get('masterclipid') or f'masterclip-{track_idx + 2}'
         template_clipitem = template_track.find('clipitem')
         template_file_element = audio_file.get('element')
+        # Per-track constants reused by every block below
+        clip_name_text = audio_file.get('name') or f'Audio Track {track_idx + 1}'
+        source_channel_text = str(audio_file.get('source_channel', 1))
+        # Per-track prototype: links are rebuilt later and only the first file element is kept,
+        # so strip both once here instead of on every copied clipitem
+        clipitem_prototype = None
+        if template_clipitem is not None:
+            clipitem_prototype = copy.deepcopy(template_clipitem)
+            for existing_link in clipitem_prototype.findall('link'):
+                clipitem_prototype.remove(existing_link)
+            for extra in clipitem_prototype.findall('file')[1:]:
+                clipitem_prototype.remove(extra)
+        # Tags (and one-level paths) the copied clipitem already carries; others are appended
+        # without a child scan
+        template_fields = set()
+        if clipitem_prototype is not None:
+            for child in clipitem_prototype:
+                template_fields.add(child.tag)
+                template_fields.update(f'{child.tag}/{sub.tag}' for sub in child)
+        has = template_fields.__contains__
         # For logging: per-track block counter
         block_index = 1
         block_counter = -1
@@ -500,71 +612,54 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             timeline_position += gap_size
 
             # Create clipitem
-            if template_clipitem is not None:
-                clipitem = ET.fromstring(ET.tostring(template_clipitem))
+            if clipitem_prototype is not None:
+                clipitem = copy.deepcopy(clipitem_prototype)
             else:
                 clipitem = ET.Element('clipitem', premiereChannelType='mono')
             clipitem.set('id', f'clipitem-{next_clip_num}')
             track.append(clipitem)
 
-            # Remove existing link nodes; new ones get added later
-            for existing_link in list(clipitem.findall('link')):
-                clipitem.remove(existing_link)
-
             # Master clip ID
-            def ensure(parent, tag):
-                child = parent.find(tag)
-                if child is None:
-                    child = ET.SubElement(parent, tag)
-                return child
-
-            masterclipid = ensure(clipitem, 'masterclipid')
+            masterclipid = ensure(clipitem, 'masterclipid', has('masterclipid'))
             masterclipid.text = template_masterclip_id
 
             # Name
-            clip_name = ensure(clipitem, 'name')
-            clip_name.text = audio_file.get('name') or f'Audio Track {track_idx + 1}'
+            clip_name = ensure(clipitem, 'name', has('name'))
+            clip_name.text = clip_name_text
 
             # Enabled
-            ensure(clipitem, 'enabled').text = 'TRUE'
+            ensure(clipitem, 'enabled', has('enabled')).text = 'TRUE'
 
             # Duration (total source file duration)
             if template_clipitem is None:
-                clip_duration = ensure(clipitem, 'duration')
+                clip_duration = ensure(clipitem, 'duration', False)
                 if audio_file.get('source_duration'):
                     clip_duration.text = str(audio_file['source_duration'])
                 else:
                     clip_duration.text = str(duration_frames)
 
             # Rate
-            clip_rate = ensure(clipitem, 'rate')
-            clip_timebase = ensure(clip_rate, 'timebase')
+            clip_rate = ensure(clipitem, 'rate', has('rate'))
+            clip_timebase = ensure(clip_rate, 'timebase', has('rate/timebase'))
             clip_timebase.text = '30'
-            clip_ntsc = ensure(clip_rate, 'ntsc')
+            clip_ntsc = ensure(clip_rate, 'ntsc', has('rate/ntsc'))
             clip_ntsc.text = 'TRUE'
 
             # Start and end in timeline
-            ensure(clipitem, 'start').text = str(timeline_position)
+            ensure(clipitem, 'start', has('start')).text = str(timeline_position)
             end_frame_on_timeline = timeline_position + duration_frames
-            ensure(clipitem, 'end').text = str(end_frame_on_timeline)
+            ensure(clipitem, 'end', has('end')).text = str(end_frame_on_timeline)
 
             # In and out of source media
-            ensure(clipitem, 'in').text = str(start_frames)
-            ensure(clipitem, 'out').text = str(end_frames)
+            ensure(clipitem, 'in', has('in')).text = str(start_frames)
+            ensure(clipitem, 'out', has('out')).text = str(end_frames)
 
             # Premiere Pro ticks
-            ensure(clipitem, 'pproTicksIn').text = str(frames_to_ppro_ticks(start_frames))
-            ensure(clipitem, 'pproTicksOut').text = str(frames_to_ppro_ticks(end_frames))
+            ensure(clipitem, 'pproTicksIn', has('pproTicksIn')).text = block['ppro_ticks_in']
+            ensure(clipitem, 'pproTicksOut', has('pproTicksOut')).text = block['ppro_ticks_out']
             
-            # File reference
-            existing_files = clipitem.findall('file')
-            if existing_files:
-                # Keep only the first file element from the template copy
-                file_elem = existing_files[0]
-                for extra in existing_files[1:]:
-                    clipitem.remove(extra)
-            else:
-                file_elem = ET.SubElement(clipitem, 'file')
+            # File reference (the prototype carries at most one file element)
+            file_elem = ensure(clipitem, 'file', has('file'))
 
             if template_file_id:
                 file_elem.set('id', template_file_id)
@@ -576,8 +671,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                     # Fresh definition: replace with template metadata
                     file_elem.clear()
                     file_elem.set('id', template_file_id)
-                    for child in template_file_element:
-                        file_elem.append(ET.fromstring(ET.tostring(child)))
+                    file_elem.extend(copy.deepcopy(child) for child in template_file_element)
                     used_file_ids.add(template_file_id)
                 else:
                     # Subsequent references should not carry embedded metadata
@@ -593,11 +687,11 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             # Source track channel mapping (L/R)
             st = ET.SubElement(clipitem, 'sourcetrack')
             ET.SubElement(st, 'mediatype').text = 'audio'
-            ET.SubElement(st, 'trackindex').text = str(srcmap.get('source_channel', 1))
+            ET.SubElement(st, 'trackindex').text = source_channel_text
             
             # Labels - CSVの色選択を反映
-            labels = ensure(clipitem, 'labels')
-            label2 = ensure(labels, 'label2')
+            labels = ensure(clipitem, 'labels', has('labels'))
+            label2 = ensure(labels, 'label2', has('labels/label2'))
             premiere_label = csv_color_to_premiere_label(block['color'])
             label2.text = premiere_label
 
@@ -618,9 +712,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             block_index += 1
         
         # Copy non-clipitem children from template (pan, outputchannelindex etc.)
-        for child in template_track:
-            if child.tag != 'clipitem':
-                track.append(ET.fromstring(ET.tostring(child)))
+        track.extend(copy.deepcopy(child) for child in template_track if child.tag != 'clipitem')
 
     # Add linking information so paired clips stay associated in Premiere
     if template_has_links:
@@ -643,7 +735,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     duration.text = str(total_duration)
     
     # Add telop clips on V1 from gaps, using a graphic template if available
-    if gaps and graphic_template_path and os.path.exists(graphic_template_path):
+    if gaps and graphic_template_path and is_regular_file(graphic_template_path):
         graphic_templates = load_graphic_templates(graphic_template_path)
         if graphic_templates:
             seq_media = sequence.find('media')
@@ -673,7 +765,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                     if template_clip is None:
                         telop_start += dur
                         continue
-                    clipitem = ET.fromstring(ET.tostring(template_clip))
+                    clipitem = copy.deepcopy(template_clip)
                     clipitem.set('id', f'vclipitem-{uuid.uuid4()}')
                     clipitem.find('start').text = str(telop_start)
                     clipitem.find('end').text = str(telop_start + dur)
@@ -703,23 +795,26 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     return root
 
 
-def prettify_xml(elem):
-    """Return a pretty-printed XML string with DOCTYPE"""
-    rough_string = ET.tostring(elem, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    xml_string = reparsed.toprettyxml(indent="\t", encoding='UTF-8').decode('utf-8')
-    
-    # Add DOCTYPE declaration
-    xml_lines = xml_string.split('\n')
-    xml_lines.insert(1, '<!DOCTYPE xmeml>')
-    
-    return '\n'.join(xml_lines)
+DOCTYPE_PREAMBLE = b'<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE xmeml>\n'  # write_xml emits it as-is
+
+
+def write_xml(elem, output_file):
+    """Write pretty-printed XML with DOCTYPE, streaming serialization into the file"""
+    ET.indent(elem, space='\t')
+    # Binary mode: the serializer encodes to UTF-8 itself, no TextIOWrapper in between.
+    # 1 MiB buffer: serialization emits many small chunks, the kernel sees few large writes
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        f.write(DOCTYPE_PREAMBLE)
+        ET.ElementTree(elem).write(f, encoding='utf-8', xml_declaration=False)
+        f.write(b'\n')
 
 
 def select_files_gui():
     """GUI file selection interface (returns csv, template_xml, optional_graphic_xml)."""
-    if not HAS_GUI:
+    if not gui_available():
         return None, None, None
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     
     try:
         root = tk.Tk()
@@ -770,52 +865,71 @@ def select_files_gui():
             pass
 
 
+# Whitespace and both quote styles added by terminal drag & drop, stripped in one pass
+_STRIP_CHARS = " \t\r\n'\""
+
+
 def prompt_for_files():
     """Prompt user for file paths interactively in the console."""
     print("\n対話モードでファイルパスを入力してください。")
     print("（ファイルをターミナルにドラッグ＆ドロップしても入力できます）")
 
-    # strip("'\"") はシングルクォートとダブルクォートの両方を除去する
-    csv_file = input("1. CSVファイルのパスを入力してください: ").strip().strip("'\"")
-    if not os.path.exists(csv_file):
+    # _STRIP_CHARS で前後の空白とシングル／ダブルクォートを一度に除去する
+    csv_file = input("1. CSVファイルのパスを入力してください: ").strip(_STRIP_CHARS)
+    if not is_regular_file(csv_file):
         print(f"エラー: CSVファイル '{csv_file}' が見つかりません。")
         return None, None, None
 
-    template_xml_file = input("2. テンプレートXMLファイルのパスを入力してください: ").strip().strip("'\"")
-    if not os.path.exists(template_xml_file):
+    template_xml_file = input("2. テンプレートXMLファイルのパスを入力してください: ").strip(_STRIP_CHARS)
+    if not is_regular_file(template_xml_file):
         print(f"エラー: テンプレートXMLファイル '{template_xml_file}' が見つかりません。")
         return None, None, None
 
     # オプションのグラフィックテンプレートも聞く
-    graphic_template_path = input("3. (オプション) グラフィックテンプレートXMLのパスを入力してください（不要な場合はEnter）: ").strip().strip("'\"")
-    if graphic_template_path and not os.path.exists(graphic_template_path):
+    graphic_template_path = input("3. (オプション) グラフィックテンプレートXMLのパスを入力してください（不要な場合はEnter）: ").strip(_STRIP_CHARS)
+    if graphic_template_path and not is_regular_file(graphic_template_path):
         print(f"警告: グラフィックテンプレート '{graphic_template_path}' が見つかりません。無視します。")
         graphic_template_path = None
 
     return csv_file, template_xml_file, graphic_template_path
 
 
+# AUTOCUT_BATCH values that enable batch mode; anything else (0, false, empty) leaves it off
+BATCH_ENV_TRUE = frozenset({'1', 'true', 'yes', 'on'})
+
+
 def main():
     graphic_template = None
+    # Batch mode (--batch, or AUTOCUT_BATCH=1/true/yes/on) never touches Tk or input(): paths must be given
+    args = [arg for arg in sys.argv[1:] if arg != '--batch']
+    batch = (
+        len(args) != len(sys.argv) - 1
+        or os.environ.get('AUTOCUT_BATCH', '').strip().lower() in BATCH_ENV_TRUE
+    )
+    interactive = len(args) < 2
+    if batch and interactive:
+        print("Usage: python premiere/tools/autocut/csv_xml_cutter.py --batch <csv_file> <template_xml_file> [graphic_template.xml]")
+        sys.exit(1)
+
     # Check if command line arguments are provided
-    if len(sys.argv) >= 3:
+    if not interactive:
         # Command line mode
-        csv_file = sys.argv[1]
-        template_xml_file = sys.argv[2]
+        csv_file = args[0]
+        template_xml_file = args[1]
         graphic_template = None
-        if len(sys.argv) >= 4:
-            graphic_template = sys.argv[3]
+        if len(args) >= 3:
+            graphic_template = args[2]
         
-        if not os.path.exists(csv_file):
+        if not is_regular_file(csv_file):
             print(f"Error: CSV file '{csv_file}' not found")
             sys.exit(1)
         
-        if not os.path.exists(template_xml_file):
+        if not is_regular_file(template_xml_file):
             print(f"Error: Template XML file '{template_xml_file}' not found")
             sys.exit(1)
     else:
         # GUI mode
-        if HAS_GUI:
+        if gui_available():
             print("ファイル選択ダイアログを開きます...")
             csv_file, template_xml_file, graphic_template = select_files_gui()
             
@@ -835,26 +949,27 @@ def main():
                 sys.exit(1)
     
     try:
-        # Generate XML
-        xml_root = create_cut_xml_from_template(csv_file, template_xml_file, graphic_template)
+        # Generate XML (CSV opened once here with the large read buffer)
+        with open_csv(csv_file) as csv_fp:
+            xml_root = create_cut_xml_from_template(csv_fp, template_xml_file, graphic_template)
         
         if xml_root is None:
             sys.exit(1)
         
         # Output file
-        output_file = f"{os.path.splitext(csv_file)[0]}_cut_from_{os.path.splitext(os.path.basename(template_xml_file))[0]}.xml"
-        
-        # Write XML with DOCTYPE
-        xml_string = prettify_xml(xml_root)
+        csv_stem = os.path.splitext(csv_file)[0]
+        template_stem = os.path.splitext(os.path.basename(template_xml_file))[0]
+        output_file = f"{csv_stem}_cut_from_{template_stem}.xml"
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(xml_string)
+        # Write XML with DOCTYPE (serialized straight into the file, no full string)
+        write_xml(xml_root, output_file)
         
         success_msg = f"XML generated: {output_file}"
         print(f"\n{success_msg}")
         
         # Show success message in GUI mode
-        if len(sys.argv) < 3 and HAS_GUI:
+        if interactive and gui_available():
+            from tkinter import messagebox
             messagebox.showinfo("完了", f"XMLファイルを生成しました:\n{output_file}")
     
     except Exception as e:
@@ -864,7 +979,8 @@ def main():
         traceback.print_exc()
         
         # Show error message in GUI mode
-        if len(sys.argv) < 3 and HAS_GUI:
+        if interactive and gui_available():
+            from tkinter import messagebox
             messagebox.showerror("エラー", error_msg)
 
 
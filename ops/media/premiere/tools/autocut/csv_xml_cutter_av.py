@@ -4,13 +4,24 @@ CSV + XML Timeline Cutter (Audio + Video)
 Clones the original cutter and adds video track regeneration alongside audio edits.
 """
 
+from bisect import bisect_left
+import copy
 import csv
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from fractions import Fraction
+from functools import lru_cache
 import uuid
 import os
+import re
 import sys
 
+# Prefer lxml (libxml2 parse/serialize) when installed; the stdlib ElementTree API is the fallback
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
 # Try to import tkinter, but also verify it can initialize (fallback to CLI on TclError)
 try:
     import tkinter as tk
@@ -28,8 +39,11 @@ except Exception:
 
 
 DEFAULT_TIMELINE_FPS = 30000 / 1001  # Premiere NTSC timeline fps (~29.97)
+PPRO_TICKS_PER_SECOND = 254016000000
+CLIPITEM_ID_RE = re.compile(r"clipitem-(\d+)")
 
 
+@lru_cache(maxsize=65536)
 def timecode_to_frames(timecode, fps=DEFAULT_TIMELINE_FPS):
     """Convert timecode string to frame number"""
     if not timecode or timecode.strip() == '':
@@ -53,57 +67,63 @@ def timecode_to_frames(timecode, fps=DEFAULT_TIMELINE_FPS):
     return int(round(total_frames))
 
 
-def frames_to_ppro_ticks(frames, fps=DEFAULT_TIMELINE_FPS):
-    """Convert frames to Premiere Pro ticks (254016000000 per second)"""
-    seconds = frames / fps
-    return int(seconds * 254016000000)
-
-
+# 直接Premiere Proラベル名を使用（GASと統一）
+PREMIERE_LABELS = frozenset({
+    'Violet', 'Rose', 'Mango', 'Yellow', 'Lavender', 'Caribbean',
+    'Tan', 'Forest', 'Blue', 'Purple', 'Teal', 'Brown', 'Gray',
+    'Iris', 'Cerulean', 'Magenta'
+})
+
+# 古い色名からの変換マッピング（後方互換性のため）
+LEGACY_COLOR_MAP = {
+    'rose': 'Rose',
+    'pink': 'Rose', 
+    'cyan': 'Caribbean',
+    'blue': 'Blue',
+    'mint': 'Mango',
+    'green': 'Forest',
+    'yellow': 'Yellow',
+    'orange': 'Mango',
+    'red': 'Rose',
+    'purple': 'Purple',
+    'brown': 'Brown',
+    'gray': 'Gray',
+    'lavender': 'Lavender',
+    'tan': 'Tan',
+    'teal': 'Teal',
+    'magenta': 'Magenta',
+    'violet': 'Violet',
+    'forest': 'Forest',
+    'iris': 'Iris',
+    'cerulean': 'Cerulean',
+    'caribbean': 'Caribbean',
+    'mango': 'Mango'
+}
+
+
+@lru_cache(maxsize=32)
 def csv_color_to_premiere_label(csv_color):
     """Convert CSV color to Premiere Pro label"""
-    # 直接Premiere Proラベル名を使用（GASと統一）
-    valid_labels = [
-        'Violet', 'Rose', 'Mango', 'Yellow', 'Lavender', 'Caribbean', 
-        'Tan', 'Forest', 'Blue', 'Purple', 'Teal', 'Brown', 'Gray',
-        'Iris', 'Cerulean', 'Magenta'
-    ]
-    
-    # 古い色名からの変換マッピング（後方互換性のため）
-    legacy_color_map = {
-        'rose': 'Rose',
-        'pink': 'Rose', 
-        'cyan': 'Caribbean',
-        'blue': 'Blue',
-        'mint': 'Mango',
-        'green': 'Forest',
-        'yellow': 'Yellow',
-        'orange': 'Mango',
-        'red': 'Rose',
-        'purple': 'Purple',
-        'brown': 'Brown',
-        'gray': 'Gray',
-        'lavender': 'Lavender',
-        'tan': 'Tan',
-        'teal': 'Teal',
-        'magenta': 'Magenta',
-        'violet': 'Violet',
-        'forest': 'Forest',
-        'iris': 'Iris',
-        'cerulean': 'Cerulean',
-        'caribbean': 'Caribbean',
-        'mango': 'Mango'
-    }
-    
     # 空の場合はデフォルト
     if not csv_color or csv_color.strip() == '':
         return 'Caribbean'
     
     # そのままPremiereラベル名として有効かチェック
-    if csv_color in valid_labels:
+    if csv_color in PREMIERE_LABELS:
         return csv_color
     
     # 古い色名から変換
-    return legacy_color_map.get(csv_color.lower(), 'Caribbean')
+    return LEGACY_COLOR_MAP.get(csv_color.lower(), 'Caribbean')
+
+
+# Keys a track segment / track source may inherit from the matching extracted media file
+SEGMENT_FILL_KEYS = frozenset({
+    'name', 'pathurl', 'element', 'source_duration', 'file_id', 'masterclipid',
+    'clip_in_base', 'clip_out_base',
+})
+SOURCE_FILL_KEYS = SEGMENT_FILL_KEYS | {'clip_start_base', 'clip_end_base'}
+# Clipitem children read when describing a template segment
+SEGMENT_TEXT_TAGS = frozenset({'start', 'end', 'in', 'out', 'name', 'masterclipid'})
 
 
 def ensure(parent, tag):
@@ -114,6 +134,36 @@ def ensure(parent, tag):
     return child
 
 
+def index_clipitem(clipitem):
+    """Drop copied <link> children and index the rest in one pass.
+
+    Returns (children, files): a map of tag -> first direct child with that tag
+    (what clipitem.find(tag) returns) and every direct <file> child.
+    """
+    children = {}
+    files = []
+    links = []
+    for child in clipitem:
+        tag = child.tag
+        if tag == 'link':
+            links.append(child)
+            continue
+        if tag == 'file':
+            files.append(child)
+        children.setdefault(tag, child)
+    for link in links:
+        clipitem.remove(link)
+    return children, files
+
+
+def ensure_indexed(parent, children, tag):
+    """ensure() against a children index from index_clipitem(); new children are registered."""
+    child = children.get(tag)
+    if child is None:
+        child = children[tag] = ET.SubElement(parent, tag)
+    return child
+
+
 def parse_int(text):
     """Parse int safely; returns None on failure."""
     if text is None:
@@ -121,27 +171,57 @@ def parse_int(text):
     text = str(text).strip()
     if not text:
         return None
-    try:
+    # Plain integers are the common case; isdecimal() accepts exactly what int() does
+    if text.isdecimal() or (text[0] == '-' and text[1:].isdecimal()):
         return int(text)
-    except Exception:
-        try:
-            return int(float(text))
-        except Exception:
-            return None
+    try:
+        return int(float(text))
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_xml(xml_file_path):
+    """Parse an XML file into an ElementTree (comments/PIs dropped under lxml, as in the stdlib)"""
+    if HAS_LXML:
+        parser = ET.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True, collect_ids=False)
+        return ET.parse(xml_file_path, parser)
+    return ET.parse(xml_file_path)
+
+
+def index_media_files(root):
+    """Map file id -> first <media>/<file> element with that id (document order).
+
+    Equivalent to ``root.find(f".//media/file[@id='{fid}']")`` per id, but walks
+    the tree once instead of once per lookup.
+    """
+    file_by_id = {}
+    for media_elem in root.iter('media'):
+        for file_elem in media_elem.findall('file'):
+            fid = file_elem.get('id')
+            if fid is not None and fid not in file_by_id:
+                file_by_id[fid] = file_elem
+    return file_by_id
 
 
-def extract_media_files_from_xml(xml_file_path):
+def extract_media_files_from_xml(xml_source, file_by_id=None):
     """Extract referenced media file information from existing XML.
+    xml_source is a file path or an already parsed root element (file_by_id may carry its
+    index_media_files() result).
     Returns a list of dicts with keys: name, pathurl, element, source_duration, file_id, masterclipid.
     """
-    tree = ET.parse(xml_file_path)
-    root = tree.getroot()
+    if isinstance(xml_source, (str, bytes, os.PathLike)):
+        root = parse_xml(xml_source).getroot()
+        file_by_id = None
+    else:
+        root = xml_source
+    if file_by_id is None:
+        file_by_id = index_media_files(root)
 
     media_files = []
     seen_names = set()
 
     # Find all clipitems with file references
-    for clipitem in root.findall('.//clipitem'):
+    for clipitem in root.iter('clipitem'):
         file_elem = clipitem.find('file')
         if file_elem is not None:
             name_elem = file_elem.find('name')
@@ -152,10 +232,8 @@ def extract_media_files_from_xml(xml_file_path):
             full_file_elem = None
             if file_id:
                 # Try to get the full file definition (may point to another clipitem's file)
-                full_file_elem = root.find(f".//media/file[@id='{file_id}']")
-                if full_file_elem is None:
-                    # Fallback: use this file element itself
-                    full_file_elem = file_elem
+                # Fallback: use this file element itself
+                full_file_elem = file_by_id.get(file_id, file_elem)
             else:
                 full_file_elem = file_elem
 
@@ -205,9 +283,9 @@ def extract_media_files_from_xml(xml_file_path):
 def load_graphic_templates(template_path):
     templates = {}
     try:
-        ttree = ET.parse(template_path)
+        ttree = parse_xml(template_path)
         troot = ttree.getroot()
-        for clip in troot.findall('.//sequence/media/video/track/clipitem'):
+        for clip in troot.iterfind('.//sequence/media/video/track/clipitem'):
             key = clip.findtext('filter/effect/name') or clip.findtext('name') or ''
             key = key.strip()
             if key:
@@ -220,17 +298,18 @@ def load_graphic_templates(template_path):
 def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_template_path=None):
     """Create cut XML using template XML structure and CSV timecodes"""
     
+    # Parse template XML once; media extraction and the structure copy share the tree
+    template_tree = parse_xml(template_xml_path)
+    template_root = template_tree.getroot()
+    template_file_by_id = index_media_files(template_root)
+    
     # Extract template media metadata
-    media_files = extract_media_files_from_xml(template_xml_path)
+    media_files = extract_media_files_from_xml(template_root, template_file_by_id)
     
     if not media_files:
         print("エラー: テンプレートXMLからメディアファイルが見つかりません")
         return None
     
-    # Parse template XML to get structure
-    template_tree = ET.parse(template_xml_path)
-    template_root = template_tree.getroot()
-    
     # Create new XML with same structure
     root = ET.Element('xmeml', version='4')
     
@@ -278,6 +357,15 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
         timeline_fps = timeline_timebase_value * 1000.0 / 1001.0
     if timeline_fps <= 0:
         timeline_fps = DEFAULT_TIMELINE_FPS
+        timeline_fps_exact = Fraction(30000, 1001)
+    else:
+        timeline_fps_exact = Fraction(timeline_timebase_value)
+        if timeline_ntsc_text == 'TRUE':
+            timeline_fps_exact *= Fraction(1000, 1001)
+
+    # Exact ticks per frame (e.g. 8475667200 at 30000/1001): integer math, no float drift
+    ticks_per_frame = PPRO_TICKS_PER_SECOND / timeline_fps_exact
+    tpf_num, tpf_den = ticks_per_frame.numerator, ticks_per_frame.denominator
 
     # Seconds-based gap (~5 sec) scaled to timeline frame rate
     gap_size_frames = int(round(timeline_fps * 5.0))
@@ -294,7 +382,12 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     template_audio = template_media.find('audio') if template_media is not None else None
     
     def deep_copy(element):
-        return ET.fromstring(ET.tostring(element)) if element is not None else None
+        # In-memory clone (no serialize/reparse); tail dropped like the old tostring round-trip
+        if element is None:
+            return None
+        copied = copy.deepcopy(element)
+        copied.tail = None
+        return copied
     
     video = ET.SubElement(media, 'video')
     if template_video is not None:
@@ -317,14 +410,28 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     current_color = None
     current_block = None
     
-    with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
+    with open(csv_file_path, 'r', encoding='utf-8', buffering=1 << 20) as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        # Resolve column indices once; absent columns read from a padded empty cell
+        column = {name: i for i, name in enumerate(header)}
+        blank = len(header)
+        i_in = column.get('イン点', blank)
+        i_out = column.get('アウト点', blank)
+        i_text = column.get('文字起こし', blank)
+        i_color = column.get('色選択', blank)
+        tc2f = timecode_to_frames
+        fps = timeline_fps
     
         for row in reader:
-            in_point = row.get('イン点', '').strip()
-            out_point = row.get('アウト点', '').strip()
-            text = row.get('文字起こし', '').strip()
-            color = row.get('色選択', '').strip()
+            if not row:
+                continue
+            if len(row) <= blank:
+                row += [''] * (blank + 1 - len(row))
+            in_point = row[i_in].strip()
+            out_point = row[i_out].strip()
+            text = row[i_text].strip()
+            color = row[i_color].strip()
             is_gap = color.startswith('GAP_') if color else False
     
             # GAP 行
@@ -336,8 +443,8 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 # Gap duration from in/out
                 if not out_point:
                     continue
-                start_frames = timecode_to_frames(in_point, fps=timeline_fps)
-                end_frames = timecode_to_frames(out_point, fps=timeline_fps)
+                start_frames = tc2f(in_point, fps)
+                end_frames = tc2f(out_point, fps)
                 if end_frames <= start_frames:
                     continue
                 segments.append({
@@ -353,8 +460,8 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 continue
     
             # Convert timecodes to frames
-            in_frames = timecode_to_frames(in_point, fps=timeline_fps)
-            out_frames = timecode_to_frames(out_point, fps=timeline_fps)
+            in_frames = tc2f(in_point, fps)
+            out_frames = tc2f(out_point, fps)
     
             if in_frames >= out_frames:
                 continue
@@ -387,31 +494,104 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     print(f"検出: ブロック {len(blocks)}個 / ギャップ {len(gaps)}個")
     
     # Helper: find max clipitem numeric suffix to avoid duplicate IDs
-    import re
-    id_re = re.compile(r"clipitem-(\d+)")
-    max_clip_num = 0
-    for ci in template_root.findall('.//clipitem'):
-        cid = ci.get('id') or ''
-        m = id_re.match(cid)
-        if m:
-            try:
-                max_clip_num = max(max_clip_num, int(m.group(1)))
-            except Exception:
-                pass
+    match_clip_id = CLIPITEM_ID_RE.match
+    max_clip_num = max(
+        (
+            int(m.group(1))
+            for ci in template_root.iter('clipitem')
+            if (m := match_clip_id(ci.get('id') or '')) is not None
+        ),
+        default=0,
+    )
     next_clip_num = max_clip_num + 1
     
-    template_has_links = bool(template_root.findall('.//sequence/media/audio/track/clipitem/link') or template_root.findall('.//sequence/media/video/track/clipitem/link'))
+    # Stop at the first link instead of collecting every match
+    template_has_links = any(
+        next(template_root.iterfind(f'.//sequence/media/{kind}/track/clipitem/link'), None) is not None
+        for kind in ('audio', 'video')
+    )
     
-    media_file_map = {}
-    media_file_name_map = {}
+    # One lookup table for both keys: ('id', file_id) and ('name', name), first entry wins
+    media_lookup = {}
     for mf in media_files:
         fid = mf.get('file_id')
-        if fid and fid not in media_file_map:
-            media_file_map[fid] = mf
+        if fid:
+            media_lookup.setdefault(('id', fid), mf)
         name = mf.get('name')
-        if name and name not in media_file_name_map:
-            media_file_name_map[name] = mf
+        if name:
+            media_lookup.setdefault(('name', name), mf)
+    lookup_get = media_lookup.get
     
+    def build_segment(ci, is_audio):
+        """Describe one template clipitem as a source segment (range_start/range_end set by caller)."""
+        # One pass over the children; the first element of each tag wins, as with find()
+        texts = {}
+        file_elem = None
+        for c in ci:
+            tag = c.tag
+            if tag == 'file':
+                if file_elem is None:
+                    file_elem = c
+            elif tag in SEGMENT_TEXT_TAGS and tag not in texts:
+                texts[tag] = c.text
+
+        seg = {}
+        seg['clipitem'] = ci
+        seg['clip_start_base'] = parse_int(texts.get('start'))
+        seg['clip_end_base'] = parse_int(texts.get('end'))
+        seg['clip_in_base'] = parse_int(texts.get('in'))
+        seg['clip_out_base'] = parse_int(texts.get('out'))
+        if seg['clip_in_base'] is not None and seg['clip_out_base'] is not None:
+            length = max(seg['clip_out_base'] - seg['clip_in_base'], 0)
+        elif seg['clip_start_base'] is not None and seg['clip_end_base'] is not None:
+            length = max(seg['clip_end_base'] - seg['clip_start_base'], 0)
+        else:
+            length = 0
+        seg['segment_length'] = length
+
+        name_text = texts.get('name')
+        if name_text:
+            seg['name'] = name_text.strip()
+
+        masterclipid_text = texts.get('masterclipid')
+        if masterclipid_text:
+            seg['masterclipid'] = masterclipid_text.strip()
+
+        resolved_file_elem = None
+        if file_elem is not None:
+            fid = file_elem.get('id')
+            if fid:
+                seg['file_id'] = fid
+                # A definition without children (bare reference) falls back to this clip's file
+                full = template_file_by_id.get(fid)
+                resolved_file_elem = full if full is not None and len(full) else file_elem
+            else:
+                resolved_file_elem = file_elem
+        if resolved_file_elem is not None:
+            seg['element'] = resolved_file_elem
+            n = resolved_file_elem.find('name')
+            p = resolved_file_elem.find('pathurl')
+            if n is not None and n.text:
+                seg['name'] = seg.get('name') or n.text
+            if p is not None and p.text:
+                seg['pathurl'] = p.text
+            dur_elem = resolved_file_elem.find('duration')
+            if dur_elem is not None and (dur_elem.text or '').isdigit():
+                seg['source_duration'] = int(dur_elem.text)
+
+        if is_audio:
+            st = ci.find('sourcetrack/trackindex')
+            if st is not None and (st.text or '').strip().isdigit():
+                seg['source_channel'] = int(st.text)
+
+        seg_lookup = lookup_get(('id', seg.get('file_id'))) or lookup_get(('name', seg.get('name')))
+        if seg_lookup:
+            seg.update({
+                key: value for key, value in seg_lookup.items()
+                if key in SEGMENT_FILL_KEYS and value and not seg.get(key)
+            })
+        return seg
+
     def build_track_sources(track_nodes, is_audio):
         sources = []
         for idx, t_track in enumerate(track_nodes):
@@ -419,75 +599,18 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             if is_audio:
                 src['source_channel'] = None
 
-            clipitems = list(t_track.findall('clipitem'))
-            segments = []
+            clipitems = t_track.findall('clipitem')
+            segments = [build_segment(ci, is_audio) for ci in clipitems]
+            # Segments tile the track's source range back to back
             cumulative = 0
-            for ci in clipitems:
-                seg = {}
-                seg['clipitem'] = ci
-                seg['clip_start_base'] = parse_int(ci.findtext('start'))
-                seg['clip_end_base'] = parse_int(ci.findtext('end'))
-                seg['clip_in_base'] = parse_int(ci.findtext('in'))
-                seg['clip_out_base'] = parse_int(ci.findtext('out'))
-                if seg['clip_in_base'] is not None and seg['clip_out_base'] is not None:
-                    length = max(seg['clip_out_base'] - seg['clip_in_base'], 0)
-                elif seg['clip_start_base'] is not None and seg['clip_end_base'] is not None:
-                    length = max(seg['clip_end_base'] - seg['clip_start_base'], 0)
-                else:
-                    length = 0
-                seg['segment_length'] = length
+            for seg in segments:
                 seg['range_start'] = cumulative
-                seg['range_end'] = cumulative + length
-                cumulative += length
-
-                name_elem = ci.find('name')
-                if name_elem is not None and name_elem.text:
-                    seg['name'] = name_elem.text.strip()
-
-                masterclipid_elem = ci.find('masterclipid')
-                if masterclipid_elem is not None and masterclipid_elem.text:
-                    seg['masterclipid'] = masterclipid_elem.text.strip()
-
-                file_elem = ci.find('file')
-                resolved_file_elem = None
-                if file_elem is not None:
-                    fid = file_elem.get('id')
-                    if fid:
-                        seg['file_id'] = fid
-                        resolved_file_elem = template_root.find(f".//media/file[@id='{fid}']") or file_elem
-                    else:
-                        resolved_file_elem = file_elem
-                if resolved_file_elem is not None:
-                    seg['element'] = resolved_file_elem
-                    n = resolved_file_elem.find('name')
-                    p = resolved_file_elem.find('pathurl')
-                    if n is not None and n.text:
-                        seg['name'] = seg.get('name') or n.text
-                    if p is not None and p.text:
-                        seg['pathurl'] = p.text
-                    dur_elem = resolved_file_elem.find('duration')
-                    if dur_elem is not None and (dur_elem.text or '').isdigit():
-                        seg['source_duration'] = int(dur_elem.text)
-
-                if is_audio:
-                    st = ci.find('sourcetrack/trackindex')
-                    if st is not None and (st.text or '').strip().isdigit():
-                        seg['source_channel'] = int(st.text)
-
-                seg_lookup = None
-                if seg.get('file_id') and seg['file_id'] in media_file_map:
-                    seg_lookup = media_file_map[seg['file_id']]
-                elif seg.get('name') and seg['name'] in media_file_name_map:
-                    seg_lookup = media_file_name_map[seg['name']]
-                if seg_lookup:
-                    for key in ('name', 'pathurl', 'element', 'source_duration', 'file_id', 'masterclipid', 'clip_in_base', 'clip_out_base'):
-                        if not seg.get(key) and seg_lookup.get(key):
-                            seg[key] = seg_lookup[key]
-
-                segments.append(seg)
+                cumulative += seg['segment_length']
+                seg['range_end'] = cumulative
 
             if segments:
                 src['segments'] = segments
+                src['_range_ends'] = [seg['range_end'] for seg in segments]
                 first_seg = segments[0]
                 for key in ('file_id', 'name', 'pathurl', 'element', 'source_duration', 'masterclipid', 'clip_start_base', 'clip_end_base', 'clip_in_base', 'clip_out_base'):
                     if first_seg.get(key) is not None:
@@ -503,18 +626,15 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             if not src.get('name') and clipitem_name:
                 src['name'] = clipitem_name
 
-            lookup = None
-            if src.get('file_id') and src['file_id'] in media_file_map:
-                lookup = media_file_map[src['file_id']]
-            elif src.get('name') and src['name'] in media_file_name_map:
-                lookup = media_file_name_map[src['name']]
-            elif media_files:
+            lookup = lookup_get(('id', src.get('file_id'))) or lookup_get(('name', src.get('name')))
+            if lookup is None and media_files:
                 lookup = media_files[min(idx, len(media_files) - 1)]
 
             if lookup:
-                for key in ('name', 'pathurl', 'element', 'source_duration', 'file_id', 'masterclipid', 'clip_start_base', 'clip_end_base', 'clip_in_base', 'clip_out_base'):
-                    if not src.get(key) and lookup.get(key):
-                        src[key] = lookup[key]
+                src.update({
+                    key: value for key, value in lookup.items()
+                    if key in SOURCE_FILL_KEYS and value and not src.get(key)
+                })
 
             if is_audio and src.get('source_channel') is None:
                 src['source_channel'] = 1 if (idx % 2 == 0) else 2
@@ -547,25 +667,44 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
         src['clip_start_offset'] = src_segments[0].get('timeline_offset', 0)
 
     def select_segment_for_frames(srcmap, start_frame, end_frame):
-        segment_list = srcmap.get('segments') or []
-        for seg in segment_list:
-            rs = seg.get('range_start')
-            re = seg.get('range_end')
-            if rs is None or re is None:
-                continue
-            if start_frame >= rs and end_frame <= re:
-                return seg
-        if segment_list:
-            return segment_list[-1]
-        return None
+        segment_list = srcmap.get('segments')
+        if not segment_list:
+            return None
+        # Ranges are contiguous, so the first segment ending at or after end_frame
+        # is the only candidate that can contain the whole [start, end] span.
+        i = bisect_left(srcmap['_range_ends'], end_frame)
+        if i < len(segment_list) and segment_list[i]['range_start'] <= start_frame:
+            return segment_list[i]
+        return segment_list[-1]
     gap_size = gap_size_frames
+    # Where each block lands on the timeline does not depend on the track: place them once.
+    # Entries are (block_counter, block, timeline_position) for blocks with a positive duration.
+    block_placements = []
+    timeline_position = 0
+    block_counter = -1
+    for seg in segments:
+        if seg['type'] == 'gap':
+            timeline_position += seg['duration_frames']
+            continue
+        block_counter += 1
+        duration_frames = seg['end_frames'] - seg['start_frames']
+        if duration_frames <= 0:
+            continue
+        timeline_position += gap_size
+        block_placements.append((block_counter, seg, timeline_position))
+        timeline_position += duration_frames
     block_clipitems = [[] for _ in range(len(blocks))]
     used_file_ids = set()
     max_timeline_end = 0
 
+    # Hot per-block loops below: skip the module attribute lookups
+    SubElement = ET.SubElement
+    Element = ET.Element
+    color_to_label = csv_color_to_premiere_label
+
     # Rebuild video tracks using segments
     for track_idx, template_track in enumerate(template_video_tracks):
-        template_clipitems = list(template_track.findall('clipitem'))
+        template_clipitems = template_track.findall('clipitem')
         template_has_clip = bool(template_clipitems)
         if not template_has_clip:
             copied_track = deep_copy(template_track)
@@ -573,7 +712,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 video.append(copied_track)
             continue
 
-        track = ET.SubElement(video, 'track')
+        track = SubElement(video, 'track')
         for attr_name, attr_value in template_track.attrib.items():
             track.set(attr_name, attr_value)
 
@@ -589,23 +728,12 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             'clip_out_base': srcmap.get('clip_out_base'),
         }
         default_template_clipitem = template_clipitems[0] if template_clipitems else None
-        timeline_position = 0
-        block_index = 1
-        block_counter = -1
+        new_clips = []
 
-        for seg in segments:
-            if seg['type'] == 'gap':
-                timeline_position += seg['duration_frames']
-                continue
-            block_counter += 1
-            block = seg
+        for block_counter, block, timeline_position in block_placements:
             start_frames = block['start_frames']
             end_frames = block['end_frames']
             duration_frames = end_frames - start_frames
-            if duration_frames <= 0:
-                continue
-
-            timeline_position += gap_size
 
             segment_info = select_segment_for_frames(srcmap, start_frames, end_frames)
             if segment_info:
@@ -636,48 +764,47 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             start_on_timeline = timeline_position + timeline_offset
             end_frame_on_timeline = start_on_timeline + duration_frames
 
-            clipitem = deep_copy(template_source_clip) if template_source_clip is not None else ET.Element('clipitem')
-            clipitem.set('id', f'clipitem-{next_clip_num}')
-            track.append(clipitem)
+            clipitem = deep_copy(template_source_clip) if template_source_clip is not None else Element('clipitem')
+            clip_id = f'clipitem-{next_clip_num}'
+            clipitem.set('id', clip_id)
+            new_clips.append(clipitem)
 
-            for existing_link in list(clipitem.findall('link')):
-                clipitem.remove(existing_link)
+            # One pass over the copied children: drop links, index tags, collect files
+            children, existing_files = index_clipitem(clipitem)
 
-            masterclipid = ensure(clipitem, 'masterclipid')
+            masterclipid = ensure_indexed(clipitem, children, 'masterclipid')
             masterclipid.text = masterclip_id_to_use
 
-            clip_name = ensure(clipitem, 'name')
+            clip_name = ensure_indexed(clipitem, children, 'name')
             clip_name.text = file_name_to_use
 
-            ensure(clipitem, 'enabled').text = 'TRUE'
+            ensure_indexed(clipitem, children, 'enabled').text = 'TRUE'
 
             clip_in_value = clip_in_base + relative_start
             clip_out_value = clip_in_value + duration_frames
             if clip_out_base_limit is not None and clip_out_value > clip_out_base_limit:
                 clip_out_value = clip_out_base_limit
 
-            ensure(clipitem, 'start').text = str(start_on_timeline)
-            ensure(clipitem, 'end').text = str(end_frame_on_timeline)
-            ensure(clipitem, 'in').text = str(clip_in_value)
-            ensure(clipitem, 'out').text = str(clip_out_value)
-            ensure(clipitem, 'pproTicksIn').text = str(frames_to_ppro_ticks(clip_in_value, fps=timeline_fps))
-            ensure(clipitem, 'pproTicksOut').text = str(frames_to_ppro_ticks(clip_out_value, fps=timeline_fps))
+            ensure_indexed(clipitem, children, 'start').text = str(start_on_timeline)
+            ensure_indexed(clipitem, children, 'end').text = str(end_frame_on_timeline)
+            ensure_indexed(clipitem, children, 'in').text = str(clip_in_value)
+            ensure_indexed(clipitem, children, 'out').text = str(clip_out_value)
+            ensure_indexed(clipitem, children, 'pproTicksIn').text = str(clip_in_value * tpf_num // tpf_den)
+            ensure_indexed(clipitem, children, 'pproTicksOut').text = str(clip_out_value * tpf_num // tpf_den)
 
-            existing_files = clipitem.findall('file')
             if existing_files:
                 file_elem = existing_files[0]
                 for extra in existing_files[1:]:
                     clipitem.remove(extra)
             else:
-                file_elem = ET.SubElement(clipitem, 'file')
+                file_elem = SubElement(clipitem, 'file')
 
             if file_id_to_use:
                 file_elem.set('id', file_id_to_use)
                 if file_id_to_use not in used_file_ids and file_element_to_use is not None:
                     file_elem.clear()
                     file_elem.set('id', file_id_to_use)
-                    for child in file_element_to_use:
-                        file_elem.append(deep_copy(child))
+                    file_elem.extend(deep_copy(child) for child in file_element_to_use)
                     used_file_ids.add(file_id_to_use)
                 else:
                     for child in list(file_elem):
@@ -688,31 +815,29 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 if pathurl_to_use:
                     ensure(file_elem, 'pathurl').text = pathurl_to_use
 
-            labels = ensure(clipitem, 'labels')
+            labels = ensure_indexed(clipitem, children, 'labels')
             label2 = ensure(labels, 'label2')
-            premiere_label = csv_color_to_premiere_label(block['color'])
+            premiere_label = color_to_label(block['color'])
             label2.text = premiere_label
 
             if 0 <= block_counter < len(block_clipitems):
                 block_clipitems[block_counter].append({
                     'clipitem': clipitem,
-                    'clip_id': clipitem.get('id'),
+                    'clip_id': clip_id,
                     'track_index': track_idx + 1,
                     'media_type': 'video'
                 })
-            timeline_position += duration_frames
             if end_frame_on_timeline > max_timeline_end:
                 max_timeline_end = end_frame_on_timeline
             next_clip_num += 1
-            block_index += 1
 
-        for child in template_track:
-            if child.tag != 'clipitem':
-                track.append(deep_copy(child))
+        # Attach the track's clipitems in one call once they are all built
+        track.extend(new_clips)
+        track.extend(deep_copy(child) for child in template_track if child.tag != 'clipitem')
 
     # Rebuild audio tracks using segments
     for track_idx, template_track in enumerate(template_audio_tracks):
-        template_clipitems = list(template_track.findall('clipitem'))
+        template_clipitems = template_track.findall('clipitem')
         template_has_clip = bool(template_clipitems)
         if not template_has_clip:
             copied_track = deep_copy(template_track)
@@ -720,7 +845,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 audio.append(copied_track)
             continue
 
-        track = ET.SubElement(audio, 'track')
+        track = SubElement(audio, 'track')
         for attr_name, attr_value in template_track.attrib.items():
             track.set(attr_name, attr_value)
 
@@ -741,23 +866,12 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             else:
                 audio_file_defaults['name'] = f'Audio Track {track_idx + 1}'
         default_template_clipitem = template_clipitems[0] if template_clipitems else None
-        timeline_position = 0
-        block_index = 1
-        block_counter = -1
+        new_clips = []
 
-        for seg in segments:
-            if seg['type'] == 'gap':
-                timeline_position += seg['duration_frames']
-                continue
-            block_counter += 1
-            block = seg
+        for block_counter, block, timeline_position in block_placements:
             start_frames = block['start_frames']
             end_frames = block['end_frames']
             duration_frames = end_frames - start_frames
-            if duration_frames <= 0:
-                continue
-
-            timeline_position += gap_size
 
             segment_info = select_segment_for_frames(srcmap, start_frames, end_frames)
             if segment_info:
@@ -790,29 +904,30 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             start_on_timeline = timeline_position + timeline_offset
             end_frame_on_timeline = start_on_timeline + duration_frames
 
-            clipitem = deep_copy(template_source_clip) if template_source_clip is not None else ET.Element('clipitem', premiereChannelType='mono')
-            clipitem.set('id', f'clipitem-{next_clip_num}')
-            track.append(clipitem)
+            clipitem = deep_copy(template_source_clip) if template_source_clip is not None else Element('clipitem', premiereChannelType='mono')
+            clip_id = f'clipitem-{next_clip_num}'
+            clipitem.set('id', clip_id)
+            new_clips.append(clipitem)
 
-            for existing_link in list(clipitem.findall('link')):
-                clipitem.remove(existing_link)
+            # One pass over the copied children: drop links, index tags, collect files
+            children, existing_files = index_clipitem(clipitem)
 
-            masterclipid = ensure(clipitem, 'masterclipid')
+            masterclipid = ensure_indexed(clipitem, children, 'masterclipid')
             masterclipid.text = masterclip_id_to_use
 
-            clip_name = ensure(clipitem, 'name')
+            clip_name = ensure_indexed(clipitem, children, 'name')
             clip_name.text = file_name_to_use
 
-            ensure(clipitem, 'enabled').text = 'TRUE'
+            ensure_indexed(clipitem, children, 'enabled').text = 'TRUE'
 
             if template_source_clip is None:
-                clip_duration = ensure(clipitem, 'duration')
+                clip_duration = ensure_indexed(clipitem, children, 'duration')
                 if audio_file_defaults.get('source_duration'):
                     clip_duration.text = str(audio_file_defaults['source_duration'])
                 else:
                     clip_duration.text = str(duration_frames)
 
-            clip_rate = ensure(clipitem, 'rate')
+            clip_rate = ensure_indexed(clipitem, children, 'rate')
             clip_timebase = ensure(clip_rate, 'timebase')
             clip_timebase.text = timeline_timebase_text
             clip_ntsc = ensure(clip_rate, 'ntsc')
@@ -823,28 +938,26 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
             if clip_out_base_limit is not None and clip_out_value > clip_out_base_limit:
                 clip_out_value = clip_out_base_limit
 
-            ensure(clipitem, 'start').text = str(start_on_timeline)
-            ensure(clipitem, 'end').text = str(end_frame_on_timeline)
-            ensure(clipitem, 'in').text = str(clip_in_value)
-            ensure(clipitem, 'out').text = str(clip_out_value)
-            ensure(clipitem, 'pproTicksIn').text = str(frames_to_ppro_ticks(clip_in_value, fps=timeline_fps))
-            ensure(clipitem, 'pproTicksOut').text = str(frames_to_ppro_ticks(clip_out_value, fps=timeline_fps))
+            ensure_indexed(clipitem, children, 'start').text = str(start_on_timeline)
+            ensure_indexed(clipitem, children, 'end').text = str(end_frame_on_timeline)
+            ensure_indexed(clipitem, children, 'in').text = str(clip_in_value)
+            ensure_indexed(clipitem, children, 'out').text = str(clip_out_value)
+            ensure_indexed(clipitem, children, 'pproTicksIn').text = str(clip_in_value * tpf_num // tpf_den)
+            ensure_indexed(clipitem, children, 'pproTicksOut').text = str(clip_out_value * tpf_num // tpf_den)
 
-            existing_files = clipitem.findall('file')
             if existing_files:
                 file_elem = existing_files[0]
                 for extra in existing_files[1:]:
                     clipitem.remove(extra)
             else:
-                file_elem = ET.SubElement(clipitem, 'file')
+                file_elem = SubElement(clipitem, 'file')
 
             if file_id_to_use:
                 file_elem.set('id', file_id_to_use)
                 if file_id_to_use not in used_file_ids and file_element_to_use is not None:
                     file_elem.clear()
                     file_elem.set('id', file_id_to_use)
-                    for child in file_element_to_use:
-                        file_elem.append(deep_copy(child))
+                    file_elem.extend(deep_copy(child) for child in file_element_to_use)
                     used_file_ids.add(file_id_to_use)
                 else:
                     for child in list(file_elem):
@@ -855,55 +968,56 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 if pathurl_to_use:
                     ensure(file_elem, 'pathurl').text = pathurl_to_use
 
-            sourcetrack = clipitem.find('sourcetrack')
-            if sourcetrack is None:
-                sourcetrack = ET.SubElement(clipitem, 'sourcetrack')
+            sourcetrack = ensure_indexed(clipitem, children, 'sourcetrack')
             mediatype = sourcetrack.find('mediatype')
             if mediatype is None:
-                mediatype = ET.SubElement(sourcetrack, 'mediatype')
+                mediatype = SubElement(sourcetrack, 'mediatype')
             mediatype.text = 'audio'
             trackindex_elem = sourcetrack.find('trackindex')
             if trackindex_elem is None:
-                trackindex_elem = ET.SubElement(sourcetrack, 'trackindex')
+                trackindex_elem = SubElement(sourcetrack, 'trackindex')
             trackindex_elem.text = str(source_channel)
 
-            labels = ensure(clipitem, 'labels')
+            labels = ensure_indexed(clipitem, children, 'labels')
             label2 = ensure(labels, 'label2')
-            premiere_label = csv_color_to_premiere_label(block['color'])
+            premiere_label = color_to_label(block['color'])
             label2.text = premiere_label
 
             if 0 <= block_counter < len(block_clipitems):
                 block_clipitems[block_counter].append({
                     'clipitem': clipitem,
-                    'clip_id': clipitem.get('id'),
+                    'clip_id': clip_id,
                     'track_index': track_idx + 1,
                     'media_type': 'audio'
                 })
-            timeline_position += duration_frames
             if end_frame_on_timeline > max_timeline_end:
                 max_timeline_end = end_frame_on_timeline
             next_clip_num += 1
-            block_index += 1
 
-        for child in template_track:
-            if child.tag != 'clipitem':
-                track.append(deep_copy(child))
+        # Attach the track's clipitems in one call once they are all built
+        track.extend(new_clips)
+        track.extend(deep_copy(child) for child in template_track if child.tag != 'clipitem')
     # Add linking information so paired clips stay associated in Premiere
     if template_has_links:
         for block_idx, items in enumerate(block_clipitems):
             if len(items) <= 1:
                 continue
+            # Every clip in the block links to the same targets; format them once.
+            # Copied clipitems were stripped of template links by index_clipitem.
+            clipindex_text = str(block_idx + 1)
+            link_fields = [
+                (target['clip_id'], target['media_type'], str(target['track_index']))
+                for target in items
+            ]
             for entry in items:
                 clipitem = entry['clipitem']
-                for link_elem in list(clipitem.findall('link')):
-                    clipitem.remove(link_elem)
-                for target in items:
-                    link = ET.SubElement(clipitem, 'link')
-                    ET.SubElement(link, 'linkclipref').text = target['clip_id']
-                    ET.SubElement(link, 'mediatype').text = target['media_type']
-                    ET.SubElement(link, 'trackindex').text = str(target['track_index'])
-                    ET.SubElement(link, 'clipindex').text = str(block_idx + 1)
-                    ET.SubElement(link, 'groupindex').text = '1'
+                for clip_id, media_type, trackindex_text in link_fields:
+                    link = SubElement(clipitem, 'link')
+                    SubElement(link, 'linkclipref').text = clip_id
+                    SubElement(link, 'mediatype').text = media_type
+                    SubElement(link, 'trackindex').text = trackindex_text
+                    SubElement(link, 'clipindex').text = clipindex_text
+                    SubElement(link, 'groupindex').text = '1'
     
     # Update sequence duration
     total_duration = max_timeline_end
@@ -923,6 +1037,7 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                 ET.SubElement(vtrack, 'enabled').text = 'TRUE'
                 ET.SubElement(vtrack, 'locked').text = 'FALSE'
     
+            default_graphic_template = next(iter(graphic_templates.values()), None)
             telop_start = 0
             for seg in segments:
                 if seg['type'] == 'gap':
@@ -936,30 +1051,28 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
                             lookup_label = upper
                         elif raw_label.isdigit():
                             lookup_label = f"NA{raw_label}"
-                    template_clip = graphic_templates.get(lookup_label) or next(iter(graphic_templates.values()), None)
+                    template_clip = graphic_templates.get(lookup_label) or default_graphic_template
                     if template_clip is None:
                         telop_start += dur
                         continue
                     clipitem = deep_copy(template_clip)
                     clipitem.set('id', f'vclipitem-{uuid.uuid4()}')
-                    clipitem.find('start').text = str(telop_start)
-                    clipitem.find('end').text = str(telop_start + dur)
-                    clipitem.find('in').text = '0'
-                    clipitem.find('out').text = str(dur)
-                    ppin = clipitem.find('pproTicksIn')
-                    if ppin is None:
-                        ppin = ET.SubElement(clipitem, 'pproTicksIn')
-                    ppin.text = str(frames_to_ppro_ticks(0, fps=timeline_fps))
-                    ppout = clipitem.find('pproTicksOut')
-                    if ppout is None:
-                        ppout = ET.SubElement(clipitem, 'pproTicksOut')
-                    ppout.text = str(frames_to_ppro_ticks(dur, fps=timeline_fps))
+                    # Index the copy's children once instead of a find() per field
+                    children = {}
+                    for child in clipitem:
+                        children.setdefault(child.tag, child)
+                    children['start'].text = str(telop_start)
+                    children['end'].text = str(telop_start + dur)
+                    children['in'].text = '0'
+                    children['out'].text = str(dur)
+                    ensure_indexed(clipitem, children, 'pproTicksIn').text = str(0 * tpf_num // tpf_den)
+                    ensure_indexed(clipitem, children, 'pproTicksOut').text = str(dur * tpf_num // tpf_den)
                     eff = clipitem.find('filter/effect')
                     if eff is not None:
                         name_elem = eff.find('name')
                         if name_elem is not None:
                             name_elem.text = telop_text or lookup_label or name_elem.text
-                    clip_name_elem = clipitem.find('name')
+                    clip_name_elem = children.get('name')
                     if clip_name_elem is not None:
                         clip_name_elem.text = telop_text or lookup_label or clip_name_elem.text
                     vtrack.append(clipitem)
@@ -970,17 +1083,17 @@ def create_cut_xml_from_template(csv_file_path, template_xml_path, graphic_templ
     return root
 
 
-def prettify_xml(elem):
-    """Return a pretty-printed XML string with DOCTYPE"""
-    rough_string = ET.tostring(elem, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    xml_string = reparsed.toprettyxml(indent="\t", encoding='UTF-8').decode('utf-8')
-    
-    # Add DOCTYPE declaration
-    xml_lines = xml_string.split('\n')
-    xml_lines.insert(1, '<!DOCTYPE xmeml>')
-    
-    return '\n'.join(xml_lines)
+DOCTYPE_PREAMBLE = b'<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE xmeml>\n'  # write_xml emits it as-is
+
+
+def write_xml(elem, output_file):
+    """Write pretty-printed XML with DOCTYPE, streaming serialization into the file"""
+    ET.indent(elem, space='\t')
+    # 1 MiB buffer: serialization emits many small chunks, the kernel sees few large writes
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        f.write(DOCTYPE_PREAMBLE)
+        ET.ElementTree(elem).write(f, encoding='utf-8', xml_declaration=False)
+        f.write(b'\n')
 
 
 def select_files_gui():
@@ -1112,10 +1225,7 @@ def main():
         output_file = f"{os.path.splitext(csv_file)[0]}_cut_from_{os.path.splitext(os.path.basename(template_xml_file))[0]}.xml"
         
         # Write XML with DOCTYPE
-        xml_string = prettify_xml(xml_root)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(xml_string)
+        write_xml(xml_root, output_file)
         
         success_msg = f"XML generated: {output_file}"
         print(f"\n{success_msg}")
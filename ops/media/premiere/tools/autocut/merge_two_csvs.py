@@ -13,7 +13,7 @@ Rows are merged and sorted by イン点 timecode ascending.
 import csv
 import os
 import sys
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 STEP1_HEADERS = [
@@ -25,6 +25,14 @@ STEP1_HEADERS = [
     'スピーカーBの文字起こし',
     'AやB以外',
 ]
+# Column positions in STEP1_HEADERS, resolved once for the per-row loop
+IDX_COLOR = STEP1_HEADERS.index('色選択')
+IDX_IN = STEP1_HEADERS.index('イン点')
+IDX_OUT = STEP1_HEADERS.index('アウト点')
+IDX_SPEAKER = STEP1_HEADERS.index('スピーカーネーム')
+IDX_TEXT_A = STEP1_HEADERS.index('スピーカーAの文字起こし')
+IDX_TEXT_B = STEP1_HEADERS.index('スピーカーBの文字起こし')
+IDX_TEXT_OTHER = STEP1_HEADERS.index('AやB以外')
 
 
 def timecode_to_frames(tc: str, fps: int = 30) -> int:
@@ -91,45 +99,43 @@ def merge_two_csvs(csv_a: str, csv_b: str, assign_by: str = 'file') -> List[List
 
     # Convert each input row to output row shape
     out_rows: List[List[str]] = []
-    for r in all_rows:
+    count_a = len(rows_a)
+    for idx, r in enumerate(all_rows):
         in_tc = r['Start Time'].replace(';', ':')
         out_tc = r['End Time'].replace(';', ':')
         speaker = r['Speaker Name']
         text = r['Text']
 
         row = [''] * len(STEP1_HEADERS)
-        row[STEP1_HEADERS.index('色選択')] = ''
-        row[STEP1_HEADERS.index('イン点')] = in_tc
-        row[STEP1_HEADERS.index('アウト点')] = out_tc
-        row[STEP1_HEADERS.index('スピーカーネーム')] = speaker
+        row[IDX_COLOR] = ''
+        row[IDX_IN] = in_tc
+        row[IDX_OUT] = out_tc
+        row[IDX_SPEAKER] = speaker
         if assign_mode == 'file':
-            # Decide by which file this row came from
-            # We detect membership by object identity in original lists
-            if r in rows_a:
-                row[STEP1_HEADERS.index('スピーカーAの文字起こし')] = text
-            elif r in rows_b:
-                row[STEP1_HEADERS.index('スピーカーBの文字起こし')] = text
+            # Decide by which file this row came from: all_rows is rows_a then rows_b
+            if idx < count_a:
+                row[IDX_TEXT_A] = text
             else:
-                row[STEP1_HEADERS.index('AやB以外')] = text
+                row[IDX_TEXT_B] = text
         else:
             if sp_a and speaker == sp_a:
-                row[STEP1_HEADERS.index('スピーカーAの文字起こし')] = text
+                row[IDX_TEXT_A] = text
             elif sp_b and speaker == sp_b:
-                row[STEP1_HEADERS.index('スピーカーBの文字起こし')] = text
+                row[IDX_TEXT_B] = text
             else:
-                row[STEP1_HEADERS.index('AやB以外')] = text
+                row[IDX_TEXT_OTHER] = text
         out_rows.append(row)
 
-    # Sort by in-point frames
-    out_rows.sort(key=lambda r: timecode_to_frames(r[STEP1_HEADERS.index('イン点')]))
+    # Sort by in-point frames (header is added by write_csv, not copied in front)
+    out_rows.sort(key=lambda r: timecode_to_frames(r[IDX_IN]))
+    return out_rows
 
-    # Prepend header
-    return [STEP1_HEADERS] + out_rows
 
-
-def write_csv(path: str, rows: List[List[str]]):
+def write_csv(path: str, rows: Iterable[List[str]], header: Optional[List[str]] = None):
     with open(path, 'w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f)
+        if header is not None:
+            writer.writerow(header)
         writer.writerows(rows)
 
 
@@ -157,7 +163,7 @@ def main():
             sys.exit(1)
 
     merged = merge_two_csvs(csv1, csv2, assign_by=assign_by)
-    write_csv(out_path, merged)
+    write_csv(out_path, merged, header=STEP1_HEADERS)
     print(f'Merged CSV written: {out_path}')
 
 